@@ -33,6 +33,10 @@ DEFAULT_AMI = {
     "sa-east-1": "ami-054e94fd9b444491d",  # SA (Sao Paulo)
 }
 
+# Cache of boto3 clients/resources keyed by (service name, region).
+_client_cache = {}
+_resource_cache = {}
+
 assert StrictVersion(boto3.__version__) >= StrictVersion("1.4.8"), \
     "Boto3 version >= 1.4.8 required, try `pip install -U boto3`"
 
@@ -95,7 +99,9 @@ def _configure_iam_role(config):
             logger.info("_configure_iam_role: "
                         "Creating new role {}".format(DEFAULT_RAY_IAM_ROLE))
             iam = _resource("iam", config)
-            iam.create_role(
+            # create_role returns the Role resource, so there is no need to
+            # look it up again before attaching policies to it.
+            role = iam.create_role(
                 RoleName=DEFAULT_RAY_IAM_ROLE,
                 AssumeRolePolicyDocument=json.dumps({
                     "Statement": [
@@ -108,8 +114,6 @@ def _configure_iam_role(config):
                         },
                     ],
                 }))
-            role = _get_role(DEFAULT_RAY_IAM_ROLE, config)
-            assert role is not None, "Failed to create role"
         role.attach_policy(
             PolicyArn="arn:aws:iam::aws:policy/AmazonEC2FullAccess")
         role.attach_policy(
@@ -147,10 +151,18 @@ def _configure_key_pair(config):
         if not key and not os.path.exists(key_path):
             logger.info("_configure_key_pair: "
                         "Creating new key pair {}".format(key_name))
-            key = ec2.create_key_pair(KeyName=key_name)
-            with open(key_path, "w") as f:
-                f.write(key.key_material)
-            os.chmod(key_path, 0o600)
+            fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL,
+                         0o600)
+            with os.fdopen(fd, "w") as f:
+                try:
+                    key = ec2.create_key_pair(KeyName=key_name)
+                    f.write(key.key_material)
+                    f.flush()
+                except BaseException:
+                    # Never leave an empty key file behind, it would be
+                    # mistaken for a valid key by the next bootstrap.
+                    os.unlink(key_path)
+                    raise
             break
 
     if not key:
@@ -173,6 +185,12 @@ def _configure_key_pair(config):
 
 
 def _configure_subnet(config):
+    # Rationale: avoid listing every subnet in the region if the subnets are
+    # already completely manually configured.
+    if "SubnetIds" in config["head_node"] and \
+            "SubnetIds" in config["worker_nodes"]:
+        return config  # have user-defined subnets
+
     ec2 = _resource("ec2", config)
     use_internal_ips = config["provider"].get("use_internal_ips", False)
     subnets = sorted(
@@ -311,14 +329,17 @@ def _get_vpc_id_or_die(config, subnet_id):
 
 def _get_security_group(config, vpc_id, group_name):
     ec2 = _resource("ec2", config)
-    existing_groups = list(
-        ec2.security_groups.filter(Filters=[{
-            "Name": "vpc-id",
-            "Values": [vpc_id]
-        }]))
-    for sg in existing_groups:
-        if sg.group_name == group_name:
-            return sg
+    # Filter by name server-side rather than paging through every security
+    # group in the VPC.
+    existing_groups = ec2.security_groups.filter(Filters=[{
+        "Name": "vpc-id",
+        "Values": [vpc_id]
+    }, {
+        "Name": "group-name",
+        "Values": [group_name]
+    }])
+    return next(
+        (sg for sg in existing_groups if sg.group_name == group_name), None)
 
 
 def _get_role(role_name, config):
@@ -358,11 +379,20 @@ def _get_key(key_name, config):
 
 
 def _client(name, config):
-    boto_config = Config(retries={"max_attempts": BOTO_MAX_RETRIES})
-    return boto3.client(name, config["provider"]["region"], config=boto_config)
+    # Constructing a boto3 client loads and parses the service model, so
+    # reuse one client per (service, region) across the bootstrap steps.
+    key = (name, config["provider"]["region"])
+    if key not in _client_cache:
+        boto_config = Config(retries={"max_attempts": BOTO_MAX_RETRIES})
+        _client_cache[key] = boto3.client(
+            name, config["provider"]["region"], config=boto_config)
+    return _client_cache[key]
 
 
 def _resource(name, config):
-    boto_config = Config(retries={"max_attempts": BOTO_MAX_RETRIES})
-    return boto3.resource(
-        name, config["provider"]["region"], config=boto_config)
+    key = (name, config["provider"]["region"])
+    if key not in _resource_cache:
+        boto_config = Config(retries={"max_attempts": BOTO_MAX_RETRIES})
+        _resource_cache[key] = boto3.resource(
+            name, config["provider"]["region"], config=boto_config)
+    return _resource_cache[key]
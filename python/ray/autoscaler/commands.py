@@ -51,7 +51,12 @@ def _bootstrap_config(config):
     cache_key = os.path.join(tempfile.gettempdir(),
                              "ray-config-{}".format(hasher.hexdigest()))
     if os.path.exists(cache_key):
-        return json.loads(open(cache_key).read())
+        resolved_config = json.loads(open(cache_key).read())
+        # The cached config is only reusable if the ssh key it resolved to
+        # is still around; otherwise bootstrap again to create a new one.
+        ssh_key = resolved_config.get("auth", {}).get("ssh_private_key")
+        if ssh_key is None or os.path.exists(os.path.expanduser(ssh_key)):
+            return resolved_config
     validate_config(config)
 
     importer = NODE_PROVIDERS.get(config["provider"]["type"])
@@ -61,8 +66,31 @@ def _bootstrap_config(config):
 
     bootstrap_config, _ = importer()
     resolved_config = bootstrap_config(config)
-    with open(cache_key, "w") as f:
-        f.write(json.dumps(resolved_config))
+    # Write to a temporary file and rename it into place, so that concurrent
+    # `ray up` invocations never read a partially written cache entry.
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(cache_key),
+        prefix=os.path.basename(cache_key) + ".")
+    try:
+        # mkstemp always creates the file as 0600; restore the mode a plain
+        # open() would have used so that the user's umask still applies.
+        f = os.fdopen(fd, "w")
+    except BaseException:
+        os.close(fd)
+        os.unlink(tmp_path)
+        raise
+    try:
+        with f:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.fchmod(f.fileno(), 0o666 & ~umask)
+            f.write(json.dumps(resolved_config))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, cache_key)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
     return resolved_config
 
 
@@ -1,18 +1,16 @@
 import os
 import logging
+import random
 import time
 
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.hazmat.backends import default_backend
+import google.auth
 from googleapiclient import discovery, errors
 
 logger = logging.getLogger(__name__)
 
-crm = discovery.build("cloudresourcemanager", "v1")
-iam = discovery.build("iam", "v1")
-compute = discovery.build("compute", "v1")
-
 VERSION = "v1"
 
 RAY = "ray-autoscaler"
@@ -24,17 +22,34 @@ DEFAULT_SERVICE_ACCOUNT_CONFIG = {
 }
 DEFAULT_SERVICE_ACCOUNT_ROLES = ("roles/storage.objectAdmin",
                                  "roles/compute.admin")
+CLOUD_PLATFORM_SCOPE = "https://www.googleapis.com/auth/cloud-platform"
 
-MAX_POLLS = 12
+# Operations are polled with jittered exponential backoff: the first sleep
+# lasts at most MIN_POLL_INTERVAL seconds, no single sleep exceeds
+# POLL_INTERVAL seconds, and polling gives up after MAX_POLL_TIME seconds.
+MIN_POLL_INTERVAL = 0.5
 POLL_INTERVAL = 5
+MAX_POLL_TIME = 60
+
+
+def poll_intervals():
+    """Yields capped, jittered, exponentially growing poll intervals."""
+    total = 0
+    upper = MIN_POLL_INTERVAL
+    while total < MAX_POLL_TIME:
+        interval = min(POLL_INTERVAL,
+                       random.uniform(MIN_POLL_INTERVAL / 2, upper))
+        yield interval
+        total += interval
+        upper *= 2
 
 
-def wait_for_crm_operation(operation):
+def wait_for_crm_operation(operation, crm):
     """Poll for cloud resource manager operation until finished."""
     logger.info("wait_for_crm_operation: "
                 "Waiting for operation {} to finish...".format(operation))
 
-    for _ in range(MAX_POLLS):
+    for interval in poll_intervals():
         result = crm.operations().get(name=operation["name"]).execute()
         if "error" in result:
             raise Exception(result["error"])
@@ -43,18 +58,18 @@ def wait_for_crm_operation(operation):
             logger.info("wait_for_crm_operation: Operation done.")
             break
 
-        time.sleep(POLL_INTERVAL)
+        time.sleep(interval)
 
     return result
 
 
-def wait_for_compute_global_operation(project_name, operation):
+def wait_for_compute_global_operation(project_name, operation, compute):
     """Poll for global compute operation until finished."""
     logger.info("wait_for_compute_global_operation: "
                 "Waiting for operation {} to finish...".format(
                     operation["name"]))
 
-    for _ in range(MAX_POLLS):
+    for interval in poll_intervals():
         result = compute.globalOperations().get(
             project=project_name,
             operation=operation["name"],
@@ -67,15 +82,16 @@ def wait_for_compute_global_operation(project_name, operation):
                         "Operation done.")
             break
 
-        time.sleep(POLL_INTERVAL)
+        time.sleep(interval)
 
     return result
 
 
 def key_pair_name(i, region, project_id, ssh_user):
     """Returns the ith default gcp_key_pair_name."""
-    key_name = "{}_gcp_{}_{}_{}".format(RAY, region, project_id, ssh_user, i)
-    return key_name
+    if i == 0:
+        return "{}_gcp_{}_{}_{}".format(RAY, region, project_id, ssh_user)
+    return "{}_gcp_{}_{}_{}_{}".format(RAY, region, project_id, ssh_user, i)
 
 
 def key_pair_paths(key_name):
@@ -103,16 +119,36 @@ def generate_rsa_key_pair():
     return public_key, pem
 
 
+def construct_clients():
+    """Builds the cloudresourcemanager, iam and compute API clients.
+
+    The clients are only needed while bootstrapping, so they are built on
+    demand instead of at import time of this module. The credentials are
+    scoped up front, so all three clients share one credential object (and
+    one access token) instead of each getting its own scoped copy.
+    """
+    credentials, _ = google.auth.default(scopes=[CLOUD_PLATFORM_SCOPE])
+
+    crm = discovery.build(
+        "cloudresourcemanager", "v1", credentials=credentials)
+    iam = discovery.build("iam", "v1", credentials=credentials)
+    compute = discovery.build("compute", "v1", credentials=credentials)
+
+    return crm, iam, compute
+
+
 def bootstrap_gcp(config):
-    config = _configure_project(config)
-    config = _configure_iam_role(config)
-    config = _configure_key_pair(config)
-    config = _configure_subnet(config)
+    crm, iam, compute = construct_clients()
+
+    config = _configure_project(config, crm)
+    config = _configure_iam_role(config, crm, iam)
+    config = _configure_key_pair(config, compute)
+    config = _configure_subnet(config, compute)
 
     return config
 
 
-def _configure_project(config):
+def _configure_project(config, crm):
     """Setup a Google Cloud Platform Project.
 
     Google Compute Platform organizes all the resources, such as storage
@@ -123,12 +159,12 @@ def _configure_project(config):
     assert config["provider"]["project_id"] is not None, (
         "'project_id' must be set in the 'provider' section of the autoscaler"
         " config. Notice that the project id must be globally unique.")
-    project = _get_project(project_id)
+    project = _get_project(project_id, crm)
 
     if project is None:
         #  Project not found, try creating it
-        _create_project(project_id)
-        project = _get_project(project_id)
+        _create_project(project_id, crm)
+        project = _get_project(project_id, crm)
 
     assert project is not None, "Failed to create project"
     assert project["lifecycleState"] == "ACTIVE", (
@@ -140,7 +176,7 @@ def _configure_project(config):
     return config
 
 
-def _configure_iam_role(config):
+def _configure_iam_role(config, crm, iam):
     """Setup a gcp service account with IAM roles.
 
     Creates a gcp service acconut and binds IAM roles which allow it to control
@@ -153,7 +189,7 @@ def _configure_iam_role(config):
     email = SERVICE_ACCOUNT_EMAIL_TEMPLATE.format(
         account_id=DEFAULT_SERVICE_ACCOUNT_ID,
         project_id=config["provider"]["project_id"])
-    service_account = _get_service_account(email, config)
+    service_account = _get_service_account(email, config, iam)
 
     if service_account is None:
         logger.info("_configure_iam_role: "
@@ -161,11 +197,13 @@ def _configure_iam_role(config):
                         DEFAULT_SERVICE_ACCOUNT_ID))
 
         service_account = _create_service_account(
-            DEFAULT_SERVICE_ACCOUNT_ID, DEFAULT_SERVICE_ACCOUNT_CONFIG, config)
+            DEFAULT_SERVICE_ACCOUNT_ID, DEFAULT_SERVICE_ACCOUNT_CONFIG, config,
+            iam)
 
     assert service_account is not None, "Failed to create service account"
 
-    _add_iam_policy_binding(service_account, DEFAULT_SERVICE_ACCOUNT_ROLES)
+    _add_iam_policy_binding(service_account, DEFAULT_SERVICE_ACCOUNT_ROLES,
+                            crm)
 
     config["head_node"]["serviceAccounts"] = [{
         "email": service_account["email"],
@@ -173,13 +211,13 @@ def _configure_iam_role(config):
         # role of the service account. Even if the cloud-platform scope
         # gives (scope) access to the whole cloud-platform, the service
         # account is limited by the IAM rights specified below.
-        "scopes": ["https://www.googleapis.com/auth/cloud-platform"]
+        "scopes": [CLOUD_PLATFORM_SCOPE]
     }]
 
     return config
 
 
-def _configure_key_pair(config):
+def _configure_key_pair(config, compute):
     """Configure SSH access, using an existing key pair if possible.
 
     Creates a project-wide ssh key that can be used to access all the instances
@@ -234,13 +272,27 @@ def _configure_key_pair(config):
                         "Creating new key pair {}".format(key_name))
             public_key, private_key = generate_rsa_key_pair()
 
-            _create_project_ssh_key_pair(project, public_key, ssh_user)
-
-            with open(private_key_path, "w") as f:
+            # Write the private key (created as 0600, so it is never
+            # readable by other users) before registering the public key,
+            # so that a concurrent bootstrap fails here instead of after
+            # the key has been added to the project metadata. Remove it
+            # again if registering fails or is interrupted.
+            fd = os.open(private_key_path, os.O_WRONLY | os.O_CREAT
+                         | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "w") as f:
                 f.write(private_key)
-            os.chmod(private_key_path, 0o600)
-
-            with open(public_key_path, "w") as f:
+            try:
+                _create_project_ssh_key_pair(project, public_key, ssh_user,
+                                             compute)
+            except BaseException:
+                os.unlink(private_key_path)
+                raise
+
+            # The public key is not secret and the exclusive open above
+            # already serializes writers, so a stale .pub is overwritten.
+            fd = os.open(public_key_path, os.O_WRONLY | os.O_CREAT
+                         | os.O_TRUNC, 0o644)
+            with os.fdopen(fd, "w") as f:
                 f.write(public_key)
 
             key_found = True
@@ -265,7 +317,7 @@ def _configure_key_pair(config):
     return config
 
 
-def _configure_subnet(config):
+def _configure_subnet(config, compute):
     """Pick a reasonable subnet if not specified by the config."""
 
     # Rationale: avoid subnet lookup if the network is already
@@ -274,7 +326,7 @@ def _configure_subnet(config):
             and "networkInterfaces" in config["worker_nodes"]):
         return config
 
-    subnets = _list_subnets(config)
+    subnets = _list_subnets(config, compute)
 
     if not subnets:
         raise NotImplementedError("Should be able to create subnet.")
@@ -305,7 +357,7 @@ def _configure_subnet(config):
     return config
 
 
-def _list_subnets(config):
+def _list_subnets(config, compute):
     response = compute.subnetworks().list(
         project=config["provider"]["project_id"],
         region=config["provider"]["region"]).execute()
@@ -313,7 +365,7 @@ def _list_subnets(config):
     return response["items"]
 
 
-def _get_subnet(config, subnet_id):
+def _get_subnet(config, subnet_id, compute):
     subnet = compute.subnetworks().get(
         project=config["provider"]["project_id"],
         region=config["provider"]["region"],
@@ -323,7 +375,7 @@ def _get_subnet(config, subnet_id):
     return subnet
 
 
-def _get_project(project_id):
+def _get_project(project_id, crm):
     try:
         project = crm.projects().get(projectId=project_id).execute()
     except errors.HttpError as e:
@@ -334,18 +386,18 @@ def _get_project(project_id):
     return project
 
 
-def _create_project(project_id):
+def _create_project(project_id, crm):
     operation = crm.projects().create(body={
         "projectId": project_id,
         "name": project_id
     }).execute()
 
-    result = wait_for_crm_operation(operation)
+    result = wait_for_crm_operation(operation, crm)
 
     return result
 
 
-def _get_service_account(account, config):
+def _get_service_account(account, config, iam):
     project_id = config["provider"]["project_id"]
     full_name = ("projects/{project_id}/serviceAccounts/{account}"
                  "".format(project_id=project_id, account=account))
@@ -360,7 +412,7 @@ def _get_service_account(account, config):
     return service_account
 
 
-def _create_service_account(account_id, account_config, config):
+def _create_service_account(account_id, account_config, config, iam):
     project_id = config["provider"]["project_id"]
 
     service_account = iam.projects().serviceAccounts().create(
@@ -373,7 +425,7 @@ def _create_service_account(account_id, account_config, config):
     return service_account
 
 
-def _add_iam_policy_binding(service_account, roles):
+def _add_iam_policy_binding(service_account, roles, crm):
     """Add new IAM roles for the service account."""
     project_id = service_account["projectId"]
     email = service_account["email"]
@@ -413,7 +465,7 @@ def _add_iam_policy_binding(service_account, roles):
     return result
 
 
-def _create_project_ssh_key_pair(project, public_key, ssh_user):
+def _create_project_ssh_key_pair(project, public_key, ssh_user, compute):
     """Inserts an ssh-key into project commonInstanceMetadata"""
 
     key_parts = public_key.split(" ")
@@ -443,6 +495,7 @@ def _create_project_ssh_key_pair(project, public_key, ssh_user):
     operation = compute.projects().setCommonInstanceMetadata(
         project=project["name"], body=common_instance_metadata).execute()
 
-    response = wait_for_compute_global_operation(project["name"], operation)
+    response = wait_for_compute_global_operation(project["name"], operation,
+                                                 compute)
 
     return response
@@ -7,7 +7,7 @@ from googleapiclient import discovery
 
 from ray.autoscaler.node_provider import NodeProvider
 from ray.autoscaler.tags import TAG_RAY_CLUSTER_NAME, TAG_RAY_NODE_NAME
-from ray.autoscaler.gcp.config import MAX_POLLS, POLL_INTERVAL
+from ray.autoscaler.gcp.config import poll_intervals
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +21,7 @@ def wait_for_compute_zone_operation(compute, project_name, operation, zone):
                 "Waiting for operation {} to finish...".format(
                     operation["name"]))
 
-    for _ in range(MAX_POLLS):
+    for interval in poll_intervals():
         result = compute.zoneOperations().get(
             project=project_name, operation=operation["name"],
             zone=zone).execute()
@@ -33,7 +33,7 @@ def wait_for_compute_zone_operation(compute, project_name, operation, zone):
                         "Operation {} finished.".format(operation["name"]))
             break
 
-        time.sleep(POLL_INTERVAL)
+        time.sleep(interval)
 
     return result
 
@@ -1,3 +1,4 @@
+import copy
 import logging
 
 from ray.autoscaler.kubernetes import core_api, log_prefix
@@ -66,7 +67,10 @@ class KubernetesNodeProvider(NodeProvider):
         core_api().patch_namespaced_pod(node_id, self.namespace, body)
 
     def create_node(self, node_config, tags, count):
-        pod_spec = node_config.copy()
+        # Deep copy: node_config is shared with the autoscaler's config, and
+        # a shallow copy would leak this pod's metadata back into it.
+        pod_spec = copy.deepcopy(node_config)
+        tags = dict(tags)
         tags[TAG_RAY_CLUSTER_NAME] = self.cluster_name
         pod_spec["metadata"]["namespace"] = self.namespace
         pod_spec["metadata"]["labels"] = tags
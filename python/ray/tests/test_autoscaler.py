@@ -1,8 +1,13 @@
+import glob
+import json
+import os
+import random
 import shutil
 import tempfile
 import threading
 import time
 import unittest
+from unittest import mock
 import yaml
 import copy
 
@@ -10,8 +15,9 @@ import ray
 import ray.services as services
 from ray.autoscaler.autoscaler import StandardAutoscaler, LoadMetrics, \
     fillout_defaults, validate_config
+from ray.autoscaler.commands import _bootstrap_config
 from ray.autoscaler.tags import TAG_RAY_NODE_TYPE, TAG_RAY_NODE_STATUS, \
-    STATUS_UP_TO_DATE, STATUS_UPDATE_FAILED
+    TAG_RAY_CLUSTER_NAME, STATUS_UP_TO_DATE, STATUS_UPDATE_FAILED
 from ray.autoscaler.node_provider import NODE_PROVIDERS, NodeProvider
 from ray.test_utils import RayTestTimeoutException
 import pytest
@@ -915,6 +921,66 @@ class AutoscalingTest(unittest.TestCase):
         autoscaler.update()
         self.waitFor(lambda: len(runner.calls) > num_calls, num_retries=150)
 
+    def bootstrapWithCache(self, config, generation):
+        """Runs _bootstrap_config with the cache in self.tmpdir.
+
+        The provider's bootstrap tags its output with `generation`. Returns
+        the resolved config and the number of times bootstrap was called.
+        """
+        key_path = os.path.join(self.tmpdir, "ray-test-key.pem")
+        calls = []
+
+        def bootstrap(config):
+            calls.append(config)
+            with open(key_path, "w") as f:
+                f.write("key")
+            config = copy.deepcopy(config)
+            config["auth"]["ssh_private_key"] = key_path
+            config["generation"] = generation
+            return config
+
+        with mock.patch.dict(NODE_PROVIDERS,
+                             {"external": lambda: (bootstrap, None)}), \
+                mock.patch("tempfile.gettempdir", return_value=self.tmpdir):
+            resolved = _bootstrap_config(copy.deepcopy(config))
+        return resolved, len(calls)
+
+    def externalConfig(self):
+        config = copy.deepcopy(SMALL_CLUSTER)
+        config["provider"] = {
+            "type": "external",
+            "module": "ray.autoscaler.node_provider.NodeProvider",
+        }
+        return config
+
+    def readCacheEntry(self):
+        entries = glob.glob(os.path.join(self.tmpdir, "ray-config-*"))
+        assert len(entries) == 1, entries
+        with open(entries[0]) as f:
+            return json.load(f)
+
+    def testBootstrapConfigCacheHit(self):
+        config = self.externalConfig()
+        resolved, calls = self.bootstrapWithCache(config, 1)
+        assert calls == 1
+        assert self.readCacheEntry() == resolved
+
+        cached, calls = self.bootstrapWithCache(config, 2)
+        assert calls == 0
+        assert cached == resolved
+        assert cached["generation"] == 1
+
+    def testBootstrapConfigCacheMissingKey(self):
+        config = self.externalConfig()
+        resolved, _ = self.bootstrapWithCache(config, 1)
+        os.remove(resolved["auth"]["ssh_private_key"])
+
+        resolved, calls = self.bootstrapWithCache(config, 2)
+        assert calls == 1
+        assert resolved["generation"] == 2
+        assert os.path.exists(resolved["auth"]["ssh_private_key"])
+        assert self.readCacheEntry() == resolved
+
     def testExternalNodeScaler(self):
         config = SMALL_CLUSTER.copy()
         config["provider"] = {
@@ -1079,6 +1145,102 @@ class AutoscalingTest(unittest.TestCase):
             runner.assert_has_call("172.0.0.{}".format(i), "start_ray_worker")
 
 
+class GCPPollIntervalsTest(unittest.TestCase):
+    def setUp(self):
+        self.gcp_config = pytest.importorskip("ray.autoscaler.gcp.config")
+
+    def checkIntervals(self, intervals):
+        gcp_config = self.gcp_config
+        assert intervals[0] <= gcp_config.MIN_POLL_INTERVAL
+        assert all(0 < i <= gcp_config.POLL_INTERVAL for i in intervals)
+        total = sum(intervals)
+        assert gcp_config.MAX_POLL_TIME <= total
+        assert total <= gcp_config.MAX_POLL_TIME + gcp_config.POLL_INTERVAL
+
+    def testSeeded(self):
+        with mock.patch.object(self.gcp_config.random, "uniform",
+                               random.Random(0).uniform):
+            intervals = list(self.gcp_config.poll_intervals())
+        self.checkIntervals(intervals)
+
+    def testLowerBound(self):
+        with mock.patch.object(self.gcp_config.random, "uniform",
+                               lambda a, b: a):
+            intervals = list(self.gcp_config.poll_intervals())
+        self.checkIntervals(intervals)
+
+    def testUpperBound(self):
+        with mock.patch.object(self.gcp_config.random, "uniform",
+                               lambda a, b: b):
+            intervals = list(self.gcp_config.poll_intervals())
+        self.checkIntervals(intervals)
+        # Grows exponentially until it is capped at POLL_INTERVAL.
+        assert intervals[:5] == [0.5, 1, 2, 4, 5]
+        assert len(intervals) == 15
+
+
+class GCPKeyPairNameTest(unittest.TestCase):
+    def testKeyPairName(self):
+        gcp_config = pytest.importorskip("ray.autoscaler.gcp.config")
+        names = [
+            gcp_config.key_pair_name(i, "us-west1", "my-project", "ubuntu")
+            for i in range(3)
+        ]
+        # The first name is kept unsuffixed so existing keys are reused.
+        assert names[0] == "ray-autoscaler_gcp_us-west1_my-project_ubuntu"
+        assert names[1] == names[0] + "_1"
+        assert names[2] == names[0] + "_2"
+
+
+class KubernetesCreateNodeTest(unittest.TestCase):
+    def testCreateNodeDoesNotMutateInputs(self):
+        k8s_provider = pytest.importorskip(
+            "ray.autoscaler.kubernetes.node_provider")
+        node_config = {
+            "apiVersion": "v1",
+            "kind": "Pod",
+            "metadata": {
+                "generateName": "ray-worker-",
+            },
+            "spec": {
+                "containers": [{
+                    "name": "ray-node"
+                }]
+            },
+        }
+        tags = {TAG_RAY_NODE_TYPE: "worker"}
+        original_node_config = copy.deepcopy(node_config)
+        original_tags = copy.deepcopy(tags)
+
+        bodies = []
+
+        def create_namespaced_pod(namespace, body):
+            bodies.append((namespace, copy.deepcopy(body)))
+
+        api = mock.MagicMock()
+        api.create_namespaced_pod.side_effect = create_namespaced_pod
+        with mock.patch.object(k8s_provider, "core_api", lambda: api):
+            provider = k8s_provider.KubernetesNodeProvider(
+                {"namespace": "ray"}, "test-cluster")
+            provider.create_node(node_config, tags, 1)
+            provider.create_node(node_config, tags, 2)
+
+        assert node_config == original_node_config
+        assert tags == original_tags
+        assert len(bodies) == 3
+        for namespace, body in bodies:
+            assert namespace == "ray"
+            assert body["metadata"] == {
+                "generateName": "ray-worker-",
+                "namespace": "ray",
+                "labels": {
+                    TAG_RAY_NODE_TYPE: "worker",
+                    TAG_RAY_CLUSTER_NAME: "test-cluster",
+                },
+            }
+            assert body["spec"] == node_config["spec"]
+
+
 if __name__ == "__main__":
     import sys
     sys.exit(pytest.main(["-v", __file__]))